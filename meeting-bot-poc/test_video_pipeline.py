@@ -5,6 +5,7 @@ Test video pipeline by launching Chrome with test page and fake video
 import asyncio
 import os
 import subprocess
+import threading
 import time
 from pathlib import Path
 from playwright.async_api import async_playwright
@@ -33,17 +34,26 @@ async def test_video_pipeline():
         '-i', 'testsrc=size=640x480:rate=30',
         '-pix_fmt', 'yuv420p',
         '-f', 'yuv4mpegpipe',
+        '-loglevel', 'error',
         '-y',
         VIDEO_PIPE
     ]
     
     ffmpeg_proc = subprocess.Popen(
         ffmpeg_cmd,
-        stdout=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
         stderr=subprocess.PIPE
     )
     print("   FFmpeg started (PID: {})".format(ffmpeg_proc.pid))
     
+    # Drain stderr continuously so FFmpeg never blocks on a full pipe buffer
+    ffmpeg_stderr = []
+    stderr_drainer = threading.Thread(
+        target=lambda: ffmpeg_stderr.extend(ffmpeg_proc.stderr),
+        daemon=True
+    )
+    stderr_drainer.start()
+    
     # Give FFmpeg time to start
     await asyncio.sleep(2)
     
@@ -77,31 +87,30 @@ async def test_video_pipeline():
         await page.click('button[onclick="testCamera()"]')
         await asyncio.sleep(3)
         
-        # Check if video element has stream
-        has_stream = await page.evaluate('''() => {
+        # Gather stream state, track settings and devices in a single round-trip
+        result = await page.evaluate('''async () => {
             const video = document.getElementById('preview');
-            return video && video.srcObject && video.srcObject.active;
+            const stream = video && video.srcObject;
+            const devices = (await navigator.mediaDevices.enumerateDevices())
+                .map(d => ({kind: d.kind, label: d.label}));
+            if (!stream || !stream.active) {
+                return {hasStream: false, devices};
+            }
+            const settings = stream.getVideoTracks()[0].getSettings();
+            return {
+                hasStream: true,
+                width: settings.width,
+                height: settings.height,
+                frameRate: settings.frameRate,
+                deviceId: settings.deviceId,
+                devices
+            };
         }''')
         
-        if has_stream:
+        if result['hasStream']:
             print("   ✅ Camera access successful - video stream active")
-            
-            # Get video stats
-            stats = await page.evaluate('''() => {
-                const video = document.getElementById('preview');
-                const stream = video.srcObject;
-                const track = stream.getVideoTracks()[0];
-                const settings = track.getSettings();
-                return {
-                    width: settings.width,
-                    height: settings.height,
-                    frameRate: settings.frameRate,
-                    deviceId: settings.deviceId
-                };
-            }''')
-            
-            print(f"   Video settings: {stats['width']}x{stats['height']} @ {stats['frameRate']}fps")
-            print(f"   Device ID: {stats['deviceId']}")
+            print(f"   Video settings: {result['width']}x{result['height']} @ {result['frameRate']}fps")
+            print(f"   Device ID: {result['deviceId']}")
         else:
             print("   ❌ Camera access failed - no video stream")
         
@@ -111,21 +120,16 @@ async def test_video_pipeline():
             print("   ✅ FFmpeg still running")
         else:
             print("   ❌ FFmpeg crashed")
-            stderr = ffmpeg_proc.stderr.read().decode()
+            stderr_drainer.join(timeout=1)
+            stderr = b"".join(ffmpeg_stderr).decode(errors="replace")
             print(f"   Error: {stderr}")
         
         # Step 6: Test WebRTC capabilities
         print("\n6. Testing WebRTC capabilities...")
         
-        # Enumerate devices
-        await page.click('button[onclick="enumerateDevices()"]')
-        await asyncio.sleep(1)
-        
-        device_info = await page.inner_text('#deviceList')
         print("   Available devices:")
-        for line in device_info.split('\n'):
-            if line.strip():
-                print(f"     {line}")
+        for device in result['devices']:
+            print(f"     {device['kind']}: {device['label'] or '(no label)'}")
         
         # Keep browser open for manual inspection
         print("\n7. Browser ready for manual inspection")
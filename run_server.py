@@ -6,7 +6,6 @@ import asyncio
 import platform
 from pathlib import Path
 import tomli
-import uvicorn
 from loguru import logger
 from upgrade import sync_user_config, select_language
 from src.open_llm_vtuber.server import WebSocketServer
@@ -24,12 +23,15 @@ def get_version() -> str:
 
 def init_logger(console_log_level: str = "INFO") -> None:
     logger.remove()
-    # Console output
+    # Console output (formatted on a background thread, off the event loop)
     logger.add(
         sys.stderr,
         level=console_log_level,
         format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | {message}",
         colorize=True,
+        enqueue=True,
+        backtrace=False,
+        diagnose=False,
     )
 
     # File output
@@ -63,16 +65,14 @@ def run(console_log_level: str):
     except Exception as e:
         logger.error(f"Error syncing user config: {e}")
 
-    atexit.register(WebSocketServer.clean_cache)
-
     # Load configurations from yaml file
     config: Config = validate_config(read_yaml("conf.yaml"))
     server_config = config.system_config
 
     # Initialize and run the WebSocket server
     server = WebSocketServer(config=config)
-    uvicorn.run(
-        app=server.app,
+    atexit.register(server.clean_cache)
+    server.run(
         host=server_config.host,
         port=server_config.port,
         log_level=console_log_level.lower(),
@@ -140,6 +140,7 @@ class AgentFactory:
                 ),
                 segment_method=mcp_settings.get("segment_method", "pysbd"),
                 interrupt_method=interrupt_method,
+                max_memory_messages=mcp_settings.get("max_memory_messages", 128),
             )
             
             return agent
@@ -5,12 +5,7 @@ from .agent_interface import AgentInterface
 from ..output_types import SentenceOutput, DisplayText
 from ..stateless_llm.stateless_llm_interface import StatelessLLMInterface
 from ...chat_history_manager import get_history
-from ..transformers import (
-    sentence_divider,
-    actions_extractor,
-    tts_filter,
-    display_processor,
-)
+from ..transformers import sentence_pipeline
 from ...config_manager import TTSPreprocessorConfig
 from ..input_types import BatchInput, TextSource, ImageSource
 from prompts import prompt_loader
@@ -77,6 +72,12 @@ class BasicMemoryAgent(AgentInterface):
         self._llm = llm
         self.chat = self._chat_function_factory(llm.chat_completion)
 
+    async def shutdown(self):
+        """Close the LLM's pooled HTTP connections, if it keeps any"""
+        aclose = getattr(self._llm, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
     def set_system(self, system: str):
         """
         Set the system prompt
@@ -208,11 +209,17 @@ class BasicMemoryAgent(AgentInterface):
 
         return "\n".join(message_parts)
 
+    def _memory_messages(self) -> List[Dict[str, Any]]:
+        """
+        Return the memory as the message list sent to the LLM.
+        """
+        return list(self._memory)
+
     def _to_messages(self, input_data: BatchInput) -> List[Dict[str, Any]]:
         """
         Prepare messages list with image support.
         """
-        messages = self._memory.copy()
+        messages = self._memory_messages()
 
         if input_data.images:
             content = []
@@ -241,14 +248,13 @@ class BasicMemoryAgent(AgentInterface):
         """
         Create the chat pipeline with transformers
 
-        The pipeline:
+        The pipeline (fused into a single generator by `sentence_pipeline`):
         LLM tokens -> sentence_divider -> actions_extractor -> display_processor -> tts_filter
         """
 
-        @tts_filter(self._tts_preprocessor_config)
-        @display_processor()
-        @actions_extractor(self._live2d_model)
-        @sentence_divider(
+        @sentence_pipeline(
+            live2d_model=self._live2d_model,
+            tts_preprocessor_config=self._tts_preprocessor_config,
             faster_first_response=self._faster_first_response,
             segment_method=self._segment_method,
             valid_tags=["think", "thought", "speak"],
@@ -1,13 +1,30 @@
 from typing import AsyncIterator, List, Dict, Any, Optional, Literal
+from collections import deque
 import json
 from loguru import logger
 
 from .basic_memory_agent import BasicMemoryAgent
 from ..output_types import SentenceOutput, DisplayText
 from ...mcp.mcp_client_manager import MCPClientManager
-from ..stateless_llm.stateless_llm_interface import StatelessLLMInterface
+from ...utils.json_utils import dumps as dumps_json
+from ..stateless_llm.stateless_llm_interface import (
+    StatelessLLMInterface,
+    TEXT_CHUNK,
+)
 from ...config_manager import TTSPreprocessorConfig
 from ..input_types import BatchInput, TextSource
+from ...chat_history_manager import get_history
+
+
+def _format_memory_state(memory) -> str:
+    """Format a one-line summary per memory message for debug logging"""
+    return "\n".join(
+        f"Memory[{i}]: role={msg.get('role')}, "
+        f"has_tool_calls={bool(msg.get('tool_calls'))}, "
+        f"tool_call_id={msg.get('tool_call_id', 'N/A')}, "
+        f"name={msg.get('name', 'N/A')}"
+        for i, msg in enumerate(memory)
+    )
 
 
 class MCPAgent(BasicMemoryAgent):
@@ -26,6 +43,7 @@ class MCPAgent(BasicMemoryAgent):
         faster_first_response: bool = True,
         segment_method: str = "pysbd",
         interrupt_method: Literal["system", "user"] = "user",
+        max_memory_messages: int = 128,
     ):
         """
         Initialize MCPAgent with MCP server configurations
@@ -39,6 +57,8 @@ class MCPAgent(BasicMemoryAgent):
             faster_first_response: Whether to enable faster first response
             segment_method: Method for sentence segmentation
             interrupt_method: Methods for writing interruptions signal in chat history
+            max_memory_messages: Maximum number of messages kept in memory.
+                The system prompt is pinned in `self._system` and never evicted.
         """
         super().__init__(
             llm=llm,
@@ -50,6 +70,8 @@ class MCPAgent(BasicMemoryAgent):
             interrupt_method=interrupt_method,
         )
         
+        # Bounded memory: oldest messages are evicted as the conversation grows
+        self._memory = deque(maxlen=max_memory_messages)
         self.mcp_configs = mcp_configs
         self.mcp_manager = None
         logger.info("MCPAgent initialized with MCP configs")
@@ -63,6 +85,10 @@ class MCPAgent(BasicMemoryAgent):
             logger.debug("MCPClientManager created, calling initialize()...")
             await self.mcp_manager.initialize()
             logger.info("MCP connections initialized successfully")
+            # The tool set is static after initialization, so bind it to the LLM once
+            prebind_tools = getattr(self._llm, "prebind_tools", None)
+            if prebind_tools is not None:
+                prebind_tools(self.mcp_manager.get_tool_schemas_for_llm())
         else:
             logger.warning("No MCP configurations provided")
     
@@ -71,7 +97,58 @@ class MCPAgent(BasicMemoryAgent):
         if self.mcp_manager:
             await self.mcp_manager.shutdown()
             logger.info("MCP connections shut down")
+        await super().shutdown()
     
+    def set_memory_from_history(self, conf_uid: str, history_uid: str) -> None:
+        """Load the memory from chat history, keeping the system prompt out of memory"""
+        messages = get_history(conf_uid, history_uid)
+
+        self._memory.clear()
+        for msg in messages:
+            self._memory.append(
+                {
+                    "role": "user" if msg["role"] == "human" else "assistant",
+                    "content": msg["content"],
+                }
+            )
+
+    def _memory_messages(self) -> List[Dict[str, Any]]:
+        """
+        Return the memory as the message list sent to the LLM.
+
+        Tool results whose assistant tool_calls message was evicted from the
+        bounded memory are dropped, since the API rejects tool messages
+        without a preceding tool call.
+        """
+        messages = []
+        known_tool_call_ids = set()
+        for msg in self._memory:
+            if msg.get("role") == "tool":
+                if msg["tool_call_id"] not in known_tool_call_ids:
+                    continue
+                # Include tool messages with all their fields
+                messages.append({
+                    "role": "tool",
+                    "tool_call_id": msg["tool_call_id"],
+                    "name": msg["name"],
+                    "content": msg["content"]
+                })
+            elif msg.get("role") == "assistant" and msg.get("tool_calls"):
+                # Assistant message with tool calls - include them
+                known_tool_call_ids.update(tc["id"] for tc in msg["tool_calls"])
+                messages.append({
+                    "role": msg["role"],
+                    "content": msg["content"],
+                    "tool_calls": msg["tool_calls"]
+                })
+            else:
+                # Regular messages without tool calls
+                messages.append({
+                    "role": msg["role"],
+                    "content": msg["content"]
+                })
+        return messages
+
     def _chat_function_factory(self, original_chat_completion):
         """
         Create a chat function that integrates MCP tool calling
@@ -94,20 +171,20 @@ class MCPAgent(BasicMemoryAgent):
             tool_calls_to_make = []
             
             # First pass: Get text and identify tool calls
-            async for chunk in self._llm.chat_completion(
+            async for kind, payload in self._llm.stream_chat_completion(
                 messages=messages,
                 system=system,
                 tools=tools if tools else None
             ):
-                if isinstance(chunk, str):
+                if kind == TEXT_CHUNK:
                     # Regular text - just yield it
-                    assistant_message_content += chunk
-                    yield chunk
+                    assistant_message_content += payload
+                    yield payload
                         
-                elif isinstance(chunk, dict) and chunk.get("type") == "tool_call":
+                else:
                     # Collect tool calls
-                    logger.debug(f"Received tool call chunk: {chunk}")
-                    tool_calls_to_make.append(chunk)
+                    logger.debug(f"Received tool call chunk: {payload}")
+                    tool_calls_to_make.append(payload)
             
             # Store the complete assistant message in memory
             # Note: This is handled by parent class after getting complete response
@@ -169,7 +246,7 @@ class MCPAgent(BasicMemoryAgent):
                 # Format the result for the LLM
                 if isinstance(result, dict) and result.get('isError', False):
                     # Error result
-                    tool_content = json.dumps({"error": result.get('content', 'Unknown error')})
+                    tool_content = dumps_json({"error": result.get('content', 'Unknown error')})
                 else:
                     # Success result - just pass the content
                     tool_content = result.get('content', '') if isinstance(result, dict) else str(result)
@@ -189,50 +266,28 @@ class MCPAgent(BasicMemoryAgent):
                     "role": "tool",
                     "tool_call_id": tool_call_id,
                     "name": func["name"],
-                    "content": json.dumps({"error": str(e)})
+                    "content": dumps_json({"error": str(e)})
                 })
         
         # Second pass: Get natural language summary from LLM
-        # Prepare messages including tool responses
-        summary_messages = []
         
         # Debug: Log memory state before preparing summary
-        logger.debug("=== Memory state before summary ===")
-        for i, msg in enumerate(self._memory):
-            logger.debug(f"Memory[{i}]: role={msg.get('role')}, "
-                        f"has_tool_calls={bool(msg.get('tool_calls'))}, "
-                        f"tool_call_id={msg.get('tool_call_id', 'N/A')}, "
-                        f"name={msg.get('name', 'N/A')}")
+        # (lazy: the dump is only formatted when DEBUG logging is enabled)
+        logger.opt(lazy=True).debug(
+            "=== Memory state before summary ===\n{}",
+            lambda: _format_memory_state(self._memory),
+        )
         
-        for msg in self._memory[1:]:  # Skip system message
-            if msg.get("role") == "tool":
-                # Include tool messages with all their fields
-                summary_messages.append({
-                    "role": "tool",
-                    "tool_call_id": msg["tool_call_id"],
-                    "name": msg["name"],
-                    "content": msg["content"]
-                })
-            else:
-                # Regular messages (including assistant messages with tool calls)
-                if msg.get("role") == "assistant" and msg.get("tool_calls"):
-                    # Assistant message with tool calls - include them
-                    summary_messages.append({
-                        "role": msg["role"],
-                        "content": msg["content"],
-                        "tool_calls": msg["tool_calls"]
-                    })
-                else:
-                    # Regular messages without tool calls
-                    summary_messages.append({
-                        "role": msg["role"],
-                        "content": msg["content"]
-                    })
+        # The system prompt is passed separately, so memory holds only the conversation
+        summary_messages = self._memory_messages()
         
         # Debug: Log summary messages before sending
-        logger.debug("=== Summary messages to send ===")
-        for i, msg in enumerate(summary_messages):
-            logger.debug(f"Message[{i}]: {msg}")
+        logger.opt(lazy=True).debug(
+            "=== Summary messages to send ===\n{}",
+            lambda: "\n".join(
+                f"Message[{i}]: {msg}" for i, msg in enumerate(summary_messages)
+            ),
+        )
         
         # Get available tools for the next call
         tools = self.mcp_manager.get_tool_schemas_for_llm()
@@ -241,19 +296,19 @@ class MCPAgent(BasicMemoryAgent):
         assistant_message_content = ""
         more_tool_calls = []
         
-        async for chunk in self._llm.chat_completion(
+        async for kind, payload in self._llm.stream_chat_completion(
             messages=summary_messages,
             system=self._system,
             tools=tools  # IMPORTANT: Include tools so LLM can make more calls
         ):
-            if isinstance(chunk, str):
-                assistant_message_content += chunk
+            if kind == TEXT_CHUNK:
+                assistant_message_content += payload
                 # Just yield the text - parent's pipeline will process it
-                yield chunk
-            elif isinstance(chunk, dict) and chunk.get("type") == "tool_call":
+                yield payload
+            else:
                 # LLM wants to make another tool call
-                logger.info(f"LLM requesting additional tool call: {chunk.get('function', {}).get('name')}")
-                more_tool_calls.append(chunk)
+                logger.info(f"LLM requesting additional tool call: {payload.get('function', {}).get('name')}")
+                more_tool_calls.append(payload)
         
         # If more tools were requested, execute them recursively
         if more_tool_calls:
@@ -273,16 +328,3 @@ class MCPAgent(BasicMemoryAgent):
                     "role": "assistant",
                     "content": assistant_message_content
                 })
-    
-    def _get_natural_error_message(self, tool_name: str, error: Exception) -> str:
-        """Convert errors to character-appropriate messages"""
-        error_str = str(error).lower()
-        
-        if "auth" in error_str or "permission" in error_str:
-            return "I'm having trouble accessing that service. "
-        elif "timeout" in error_str:
-            return "That's taking a bit longer than expected. "
-        elif "not found" in error_str:
-            return "I couldn't find what you're looking for. "
-        else:
-            return "I ran into a small issue there. "
\ No newline at end of file
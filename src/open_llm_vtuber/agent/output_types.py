@@ -3,7 +3,7 @@ from typing import List, Optional
 from abc import ABC, abstractmethod
 
 
-@dataclass
+@dataclass(slots=True)
 class Actions:
     """Represents actions that can be performed alongside text output"""
 
@@ -19,13 +19,16 @@ class Actions:
 class BaseOutput(ABC):
     """Base class for agent outputs that can be iterated"""
 
+    # Empty, so slotted subclasses don't get a per-instance __dict__
+    __slots__ = ()
+
     @abstractmethod
     def __aiter__(self):
         """Make the output iterable"""
         pass
 
 
-@dataclass
+@dataclass(slots=True)
 class DisplayText:
     """Text to be displayed with optional metadata"""
 
@@ -42,7 +45,7 @@ class DisplayText:
         return f"{self.name}: {self.text}"
 
 
-@dataclass
+@dataclass(slots=True)
 class SentenceOutput(BaseOutput):
     """
     Output type for text-based responses.
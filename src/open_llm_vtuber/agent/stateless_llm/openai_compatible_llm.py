@@ -3,7 +3,13 @@ This class is responsible for handling asynchronous interaction with OpenAI API
 endpoints for language generation.
 """
 
-from typing import AsyncIterator, List, Dict, Any, Union
+import asyncio
+import hashlib
+import importlib.util
+from collections import OrderedDict
+from contextlib import aclosing
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple, Union
+import httpx
 from openai import (
     AsyncStream,
     AsyncOpenAI,
@@ -14,7 +20,42 @@ from openai import (
 from openai.types.chat import ChatCompletionChunk
 from loguru import logger
 
-from .stateless_llm_interface import StatelessLLMInterface
+from ...utils.json_utils import dumps_bytes
+from ...utils.sentence_divider import COMMAS, END_PUNCTUATIONS
+from .stateless_llm_interface import (
+    StatelessLLMInterface,
+    TEXT_CHUNK,
+    TOOL_CALL_CHUNK,
+)
+
+# Maximum number of responses kept by the exact-match response cache
+RESPONSE_CACHE_SIZE = 128
+
+# Streamed text is yielded in small batches instead of per delta. A batch is
+# flushed once it reaches this many characters, once this many seconds have
+# passed since its first delta, or as soon as it contains a character the
+# sentence divider may split on (so batching never delays a sentence).
+TOKEN_BATCH_CHARS = 32
+TOKEN_BATCH_SECONDS = 0.02
+_BATCH_FLUSH_CHARS = frozenset("".join(END_PUNCTUATIONS + COMMAS) + "\n>")
+
+# Default `tools` of `stream_chat_completion`: use the tools bound with `prebind_tools`.
+# An explicit None still means no tools.
+_PREBOUND_TOOLS: Any = object()
+
+# HTTP/2 needs the optional `h2` package (httpx[http2])
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class _ToolCallFragments:
+    """Streamed fragments of a single tool call, joined once the stream ends"""
+
+    __slots__ = ("id", "name_parts", "arg_parts")
+
+    def __init__(self, tool_call_id: Optional[str]):
+        self.id = tool_call_id
+        self.name_parts: List[str] = []
+        self.arg_parts: List[str] = []
 
 
 class AsyncLLM(StatelessLLMInterface):
@@ -26,6 +67,7 @@ class AsyncLLM(StatelessLLMInterface):
         organization_id: str = "z",
         project_id: str = "z",
         temperature: float = 1.0,
+        prompt_caching: bool = True,
     ):
         """
         Initializes an instance of the `AsyncLLM` class.
@@ -37,21 +79,88 @@ class AsyncLLM(StatelessLLMInterface):
         - project_id (str, optional): The project ID for the OpenAI API. Defaults to "z".
         - llm_api_key (str, optional): The API key for the OpenAI API. Defaults to "z".
         - temperature (float, optional): What sampling temperature to use, between 0 and 2. Defaults to 1.0.
+        - prompt_caching (bool, optional): Mark the system prompt as a cacheable prefix on
+          Anthropic-compatible endpoints. OpenAI caches stable prefixes automatically. Defaults to True.
         """
         self.base_url = base_url
         self.model = model
         self.temperature = temperature
+        self.prompt_caching = prompt_caching
+        # Anthropic's OpenAI-compatible endpoint only caches prefixes marked with cache_control
+        self._explicit_cache_control = prompt_caching and "anthropic" in (base_url or "")
+        # Keep connections alive across turns so each request skips the TCP/TLS handshake
+        self._http_client = httpx.AsyncClient(
+            http2=_HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=60.0,
+            ),
+            # Same overall limit as the SDK's default client, with a faster connect timeout
+            timeout=httpx.Timeout(600.0, connect=5.0),
+            follow_redirects=True,
+        )
         self.client = AsyncOpenAI(
             base_url=base_url,
             organization=organization_id,
             project=project_id,
             api_key=llm_api_key,
+            http_client=self._http_client,
         )
+        # Reused request list (system prompt + messages) to avoid a full copy per turn.
+        # The SDK serializes it during create(), so it is free again once the call ends.
+        self._scratch_messages: List[Dict[str, Any]] = []
+        self._scratch_in_use = False
+        # Exact-match cache of deterministic (temperature 0, tool-less) responses
+        self._response_cache: OrderedDict[str, str] = OrderedDict()
+        # Tools bound once with `prebind_tools`, used when a stream call passes no tools
+        self._tools: Optional[List[Dict[str, Any]]] = None
+        self._tools_kwargs: Optional[Dict[str, Any]] = None
 
         logger.info(
             f"Initialized AsyncLLM with the parameters: {self.base_url}, {self.model}"
         )
 
+    async def aclose(self):
+        """Close the API client and its pooled HTTP connections"""
+        await self.client.close()
+        await self._http_client.aclose()
+
+    def prebind_tools(self, tools: Optional[List[Dict[str, Any]]]) -> None:
+        """
+        Bind a static tool set to this instance.
+
+        Stream calls that omit `tools` (or pass this same list) reuse the prebuilt
+        `tools`/`tool_choice` request arguments instead of rebuilding them per turn.
+
+        Args:
+            tools: The tool schemas to bind, or None to unbind
+        """
+        self._tools = tools or None
+        self._tools_kwargs = (
+            {"tools": self._tools, "tool_choice": "auto"} if self._tools else None
+        )
+
+    def _response_cache_key(
+        self, messages: List[Dict[str, Any]], tools: List[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """
+        Return the response cache key for a request, or None if it is not cacheable.
+        Only deterministic requests (temperature 0, no tools) are cached.
+        """
+        if self.temperature != 0 or tools:
+            return None
+        payload = dumps_bytes(
+            {
+                "model": self.model,
+                "messages": messages,
+                "temperature": self.temperature,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload).hexdigest()
+
     async def supports_function_calling(self) -> bool:
         """OpenAI-compatible endpoints typically support function calling"""
         return True
@@ -75,16 +184,70 @@ class AsyncLLM(StatelessLLMInterface):
         - RateLimitError: When a 429 status code is received
         - APIError: For other API-related errors
         """
-        logger.debug(f"Messages: {messages}")
+        async with aclosing(
+            self.stream_chat_completion(messages, system, tools)
+        ) as chunks:
+            async for _, payload in chunks:
+                yield payload
+
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        system: str = None,
+        tools: Optional[List[Dict[str, Any]]] = _PREBOUND_TOOLS,
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        Generates a chat completion as tagged `(kind, payload)` chunks.
+
+        Parameters:
+        - messages (List[Dict[str, Any]]): The list of messages to send to the API.
+        - system (str, optional): System prompt to use for this completion.
+        - tools (List[Dict[str, Any]], optional): List of tools available for the LLM to use.
+          Defaults to the tools bound with `prebind_tools`; None sends no tools.
+
+        Yields:
+        - Tuple[int, Any]: `(TEXT_CHUNK, str)` for text content or
+          `(TOOL_CALL_CHUNK, dict)` for complete tool calls.
+        """
+        logger.info(f"Chat completion with {len(messages)} messages")
+        logger.opt(lazy=True).debug("Messages: {}", lambda: messages)
         stream = None
+        uses_scratch = False
+        if tools is _PREBOUND_TOOLS:
+            tools = self._tools
         try:
-            # If system prompt is provided, add it to the messages
+            # If system prompt is provided, add it to the messages.
+            # It always goes first so the static prefix stays identical across turns,
+            # which is what provider-side prompt caching keys on.
             messages_with_system = messages
             if system:
-                messages_with_system = [
-                    {"role": "system", "content": system},
-                    *messages,
-                ]
+                system_message = {"role": "system", "content": system}
+                if self._explicit_cache_control:
+                    system_message["content"] = [
+                        {
+                            "type": "text",
+                            "text": system,
+                            "cache_control": {"type": "ephemeral"},
+                        }
+                    ]
+                # Reuse the scratch list unless another call on this instance holds it
+                if self._scratch_in_use:
+                    messages_with_system = []
+                else:
+                    messages_with_system = self._scratch_messages
+                    self._scratch_in_use = uses_scratch = True
+                messages_with_system.append(system_message)
+                messages_with_system.extend(messages)
+
+            cache_key = self._response_cache_key(messages_with_system, tools)
+            if cache_key is not None:
+                cached = self._response_cache.get(cache_key)
+                if cached is not None:
+                    logger.debug("Serving chat completion from the response cache")
+                    self._response_cache.move_to_end(cache_key)
+                    yield TEXT_CHUNK, cached
+                    return
+            response_parts = []
 
             # Build kwargs for the API call
             kwargs = {
@@ -94,8 +257,10 @@ class AsyncLLM(StatelessLLMInterface):
                 "temperature": self.temperature,
             }
             
-            # Add tools if provided
-            if tools:
+            # Add tools if provided, reusing the prebound arguments when possible
+            if tools is not None and tools is self._tools:
+                kwargs.update(self._tools_kwargs)
+            elif tools:
                 kwargs["tools"] = tools
                 kwargs["tool_choice"] = "auto"
             
@@ -103,50 +268,85 @@ class AsyncLLM(StatelessLLMInterface):
                 ChatCompletionChunk
             ] = await self.client.chat.completions.create(**kwargs)
             
-            # Tool call aggregator for streaming chunks
-            tool_calls_aggregator = {}  # {index: {"id": ..., "name": ..., "arguments": ""}}
+            # Tool call aggregator for streaming chunks.
+            # Tool call indices are small and dense, so a list indexed by them is enough.
+            tool_calls_aggregator: List[Optional[_ToolCallFragments]] = []
+            
+            loop = asyncio.get_running_loop()
+            batch = []
+            batch_chars = 0
+            batch_started = 0.0
             
             async for chunk in stream:
                 delta = chunk.choices[0].delta
                 
-                # Yield text content
-                if delta.content:
-                    yield delta.content
+                # Yield text content in batches
+                content = delta.content
+                if content:
+                    response_parts.append(content)
+                    now = loop.time()
+                    if not batch:
+                        batch_started = now
+                    batch.append(content)
+                    batch_chars += len(content)
+                    if (
+                        batch_chars >= TOKEN_BATCH_CHARS
+                        or now - batch_started >= TOKEN_BATCH_SECONDS
+                        or not _BATCH_FLUSH_CHARS.isdisjoint(content)
+                    ):
+                        yield TEXT_CHUNK, "".join(batch)
+                        batch.clear()
+                        batch_chars = 0
                 
-                # Aggregate tool call chunks
-                if hasattr(delta, 'tool_calls') and delta.tool_calls:
-                    for tool_call_chunk in delta.tool_calls:
-                        index = tool_call_chunk.index
+                # Aggregate tool call chunks (ChoiceDelta always has tool_calls, possibly None)
+                tool_call_chunks = delta.tool_calls
+                if tool_call_chunks:
+                    for tool_call_chunk in tool_call_chunks:
+                        # Some providers omit the index for single tool calls
+                        index = tool_call_chunk.index or 0
                         
                         # Initialize aggregator for this index
-                        if index not in tool_calls_aggregator:
-                            tool_calls_aggregator[index] = {
-                                "id": tool_call_chunk.id,
-                                "name": "",
-                                "arguments": ""
-                            }
+                        while len(tool_calls_aggregator) <= index:
+                            tool_calls_aggregator.append(None)
+                        fragments = tool_calls_aggregator[index]
+                        if fragments is None:
+                            fragments = _ToolCallFragments(tool_call_chunk.id)
+                            tool_calls_aggregator[index] = fragments
                         
                         # Accumulate name and arguments
-                        if tool_call_chunk.function.name:
-                            tool_calls_aggregator[index]["name"] += tool_call_chunk.function.name
-                        if tool_call_chunk.function.arguments:
-                            tool_calls_aggregator[index]["arguments"] += tool_call_chunk.function.arguments
+                        function = tool_call_chunk.function
+                        if function.name:
+                            fragments.name_parts.append(function.name)
+                        if function.arguments:
+                            fragments.arg_parts.append(function.arguments)
             
+            if batch:
+                yield TEXT_CHUNK, "".join(batch)
+            
+            # Only cache responses that streamed to completion
+            if cache_key is not None and response_parts:
+                self._response_cache[cache_key] = "".join(response_parts)
+                if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                    self._response_cache.popitem(last=False)
+
             # After stream completes, yield complete tool calls
-            for index, call_info in tool_calls_aggregator.items():
-                if call_info["name"]:  # Only yield if we have a function name
+            for index, fragments in enumerate(tool_calls_aggregator):
+                if fragments is None:
+                    continue
+                name = "".join(fragments.name_parts)
+                if name:  # Only yield if we have a function name
                     # Generate ID if missing or empty
-                    tool_id = call_info["id"]
+                    tool_id = fragments.id
                     if not tool_id:
-                        tool_id = f"call_{index}_{call_info['name']}"
+                        tool_id = f"call_{index}_{name}"
                         logger.debug(f"Generated tool call ID: {tool_id}")
                     
-                    yield {
+                    yield TOOL_CALL_CHUNK, {
                         "type": "tool_call",
                         "id": tool_id,
                         "function": {
-                            "name": call_info["name"],
-                            "arguments": call_info["arguments"]
+                            "name": name,
+                            "arguments": "".join(fragments.arg_parts)
                         }
                     }
 
@@ -154,13 +354,13 @@ class AsyncLLM(StatelessLLMInterface):
             logger.error(
                 f"Error calling the chat endpoint: Connection error. Failed to connect to the LLM API. \nCheck the configurations and the reachability of the LLM backend. \nSee the logs for details. \nTroubleshooting with documentation: https://open-llm-vtuber.github.io/docs/faq#%E9%81%87%E5%88%B0-error-calling-the-chat-endpoint-%E9%94%99%E8%AF%AF%E6%80%8E%E4%B9%88%E5%8A%9E \n{e.__cause__}"
             )
-            yield "Error calling the chat endpoint: Connection error. Failed to connect to the LLM API. Check the configurations and the reachability of the LLM backend. See the logs for details. Troubleshooting with documentation: [https://open-llm-vtuber.github.io/docs/faq#%E9%81%87%E5%88%B0-error-calling-the-chat-endpoint-%E9%94%99%E8%AF%AF%E6%80%8E%E4%B9%88%E5%8A%9E]"
+            yield TEXT_CHUNK, "Error calling the chat endpoint: Connection error. Failed to connect to the LLM API. Check the configurations and the reachability of the LLM backend. See the logs for details. Troubleshooting with documentation: [https://open-llm-vtuber.github.io/docs/faq#%E9%81%87%E5%88%B0-error-calling-the-chat-endpoint-%E9%94%99%E8%AF%AF%E6%80%8E%E4%B9%88%E5%8A%9E]"
 
         except RateLimitError as e:
             logger.error(
                 f"Error calling the chat endpoint: Rate limit exceeded: {e.response}"
             )
-            yield "Error calling the chat endpoint: Rate limit exceeded. Please try again later. See the logs for details."
+            yield TEXT_CHUNK, "Error calling the chat endpoint: Rate limit exceeded. Please try again later. See the logs for details."
 
         except APIError as e:
             # Check if it's a tools-related error
@@ -171,17 +371,21 @@ class AsyncLLM(StatelessLLMInterface):
                 kwargs.pop("tool_choice", None)
                 stream = await self.client.chat.completions.create(**kwargs)
                 async for chunk in stream:
-                    if chunk.choices[0].delta.content:
-                        yield chunk.choices[0].delta.content
+                    content = chunk.choices[0].delta.content
+                    if content:
+                        yield TEXT_CHUNK, content
             else:
                 logger.error(f"LLM API: Error occurred: {e}")
                 logger.info(f"Base URL: {self.base_url}")
                 logger.info(f"Model: {self.model}")
                 logger.info(f"Messages: {messages}")
                 logger.info(f"temperature: {self.temperature}")
-                yield "Error calling the chat endpoint: Error occurred while generating response. See the logs for details."
+                yield TEXT_CHUNK, "Error calling the chat endpoint: Error occurred while generating response. See the logs for details."
 
         finally:
+            if uses_scratch:
+                self._scratch_messages.clear()
+                self._scratch_in_use = False
             # make sure the stream is properly closed
             # so when interrupted, no more tokens will being generated.
             if stream:
@@ -1,5 +1,9 @@
 import abc
-from typing import AsyncIterator, List, Dict, Any
+from typing import AsyncIterator, List, Dict, Any, Tuple
+
+# Chunk kinds yielded by `StatelessLLMInterface.stream_chat_completion`
+TEXT_CHUNK = 0
+TOOL_CALL_CHUNK = 1
 
 
 class StatelessLLMInterface(metaclass=abc.ABCMeta):
@@ -40,6 +44,25 @@ class StatelessLLMInterface(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError
 
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        system: str = None,
+        tools: List[Dict[str, Any]] = None,
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        Generates a chat completion as a stream of `(kind, payload)` tuples.
+
+        `kind` is `TEXT_CHUNK` for text tokens (payload is a `str`) or
+        `TOOL_CALL_CHUNK` for complete tool calls (payload is a `dict`), so
+        consumers can branch on an int instead of type-checking each chunk.
+
+        The default implementation wraps `chat_completion` and ignores `tools`;
+        LLMs that support function calling should override it.
+        """
+        async for token in self.chat_completion(messages, system):
+            yield TEXT_CHUNK, token
+
     async def supports_function_calling(self) -> bool:
         """Check if this LLM supports function calling"""
         return False  # Default, override in implementations
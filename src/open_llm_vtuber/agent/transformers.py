@@ -1,13 +1,84 @@
-from typing import AsyncIterator, Tuple, Callable, List
+from typing import AsyncIterator, Tuple, Callable, List, Optional
 from functools import wraps
 from .output_types import Actions, SentenceOutput, DisplayText
 from ..utils.tts_preprocessor import tts_filter as filter_text
 from ..live2d_model import Live2dModel
 from ..config_manager import TTSPreprocessorConfig
 from ..utils.sentence_divider import SentenceDivider
-from ..utils.sentence_divider import SentenceWithTags, TagState
+from ..utils.sentence_divider import (
+    HAS_THINK,
+    HAS_THOUGHT,
+    IS_TAG_BOUNDARY,
+    SentenceWithTags,
+    TagState,
+)
 from loguru import logger
 
+def _extract_actions(sentence: SentenceWithTags, live2d_model: Live2dModel) -> Actions:
+    """Extract Live2D expressions from a sentence"""
+    actions = Actions()
+    # Only extract emotions for non-tag text
+    if not sentence.flags & IS_TAG_BOUNDARY:
+        expressions = live2d_model.extract_emotion(sentence.text)
+        if expressions:
+            actions.expressions = expressions
+    return actions
+
+
+def _to_display_text(sentence: SentenceWithTags) -> Optional[DisplayText]:
+    """Build the display text for a sentence, or None if it should not be shown"""
+    # Thought blocks are never displayed
+    if sentence.flags & HAS_THOUGHT:
+        return None
+
+    text = sentence.text
+    # Tag markers only rewrite the text on tag boundaries
+    if sentence.flags & IS_TAG_BOUNDARY:
+        for tag in sentence.tags:
+            if tag.name == "think":
+                # Legacy think tag handling
+                if tag.state == TagState.START:
+                    text = "("
+                elif tag.state == TagState.END:
+                    text = ")"
+            elif tag.name == "speak":
+                # Speak tag - don't show the tag markers
+                if tag.state in _BOUNDARY_STATES:
+                    text = ""
+
+    return DisplayText(text=text)
+
+
+def _to_sentence_output(
+    sentence: SentenceWithTags,
+    display: DisplayText,
+    actions: Actions,
+    config: TTSPreprocessorConfig,
+) -> SentenceOutput:
+    """Filter the display text for TTS and assemble the final output"""
+    # Skip TTS for think/thought tags, and skip the filters for empty text
+    # (e.g. speak tag markers) since there is nothing to filter
+    if sentence.flags & HAS_THINK or not display.text:
+        tts = ""
+    else:
+        tts = filter_text(
+            text=display.text,
+            remove_special_char=config.remove_special_char,
+            ignore_brackets=config.ignore_brackets,
+            ignore_parentheses=config.ignore_parentheses,
+            ignore_asterisks=config.ignore_asterisks,
+            ignore_angle_brackets=config.ignore_angle_brackets,
+        )
+
+    logger.debug("[{}] display: {}", display.name, display.text)
+    logger.debug("[{}] tts: {}", display.name, tts)
+
+    return SentenceOutput(
+        display_text=display,
+        tts_text=tts,
+        actions=actions,
+    )
+
 
 def sentence_divider(
     faster_first_response: bool = True,
@@ -34,9 +105,11 @@ def sentence_divider(
                 valid_tags=valid_tags or ["think", "thought", "speak"],
             )
             token_stream = func(*args, **kwargs)
+            sentence_count = 0
             async for sentence in divider.process_stream(token_stream):
+                sentence_count += 1
                 yield sentence
-                logger.debug(f"sentence_divider: {sentence}")
+            logger.debug(f"sentence_divider: {sentence_count} sentences")
 
         return wrapper
 
@@ -57,15 +130,7 @@ def actions_extractor(live2d_model: Live2dModel):
         ) -> AsyncIterator[Tuple[SentenceWithTags, Actions]]:
             sentence_stream = func(*args, **kwargs)
             async for sentence in sentence_stream:
-                actions = Actions()
-                # Only extract emotions for non-tag text
-                if not any(
-                    tag.state in [TagState.START, TagState.END] for tag in sentence.tags
-                ):
-                    expressions = live2d_model.extract_emotion(sentence.text)
-                    if expressions:
-                        actions.expressions = expressions
-                yield sentence, actions
+                yield sentence, _extract_actions(sentence, live2d_model)
 
         return wrapper
 
@@ -87,35 +152,9 @@ def display_processor():
             stream = func(*args, **kwargs)
 
             async for sentence, actions in stream:
-                text = sentence.text
-                should_display = True
-                
-                # First, check if this is a thought block - this takes precedence
-                is_thought_block = False
-                for tag in sentence.tags:
-                    if tag.name == "thought" and tag.state in [TagState.INSIDE, TagState.START, TagState.END]:
-                        is_thought_block = True
-                        break  # Found a thought tag, no need to check further
-                
-                if is_thought_block:
-                    should_display = False  # Thought blocks are never displayed
-                else:
-                    # Only process other tags if this isn't a thought block
-                    for tag in sentence.tags:
-                        if tag.name == "think":
-                            # Legacy think tag handling
-                            if tag.state == TagState.START:
-                                text = "("
-                            elif tag.state == TagState.END:
-                                text = ")"
-                        elif tag.name == "speak":
-                            # Speak tag - always display (unless it's a thought block)
-                            if tag.state in [TagState.START, TagState.END]:
-                                text = ""  # Don't show the tag markers
-
+                display = _to_display_text(sentence)
                 # Only yield if we should display this content
-                if should_display:
-                    display = DisplayText(text=text)
+                if display is not None:
                     yield sentence, display, actions
 
         return wrapper
@@ -142,27 +181,56 @@ def tts_filter(
             config = tts_preprocessor_config or TTSPreprocessorConfig()
 
             async for sentence, display, actions in sentence_stream:
-                # Skip TTS for think/thought tags
-                if any(tag.name in ["think", "thought"] for tag in sentence.tags):
-                    tts = ""
-                else:
-                    tts = filter_text(
-                        text=display.text,
-                        remove_special_char=config.remove_special_char,
-                        ignore_brackets=config.ignore_brackets,
-                        ignore_parentheses=config.ignore_parentheses,
-                        ignore_asterisks=config.ignore_asterisks,
-                        ignore_angle_brackets=config.ignore_angle_brackets,
-                    )
-
-                logger.debug(f"[{display.name}] display: {display.text}")
-                logger.debug(f"[{display.name}] tts: {tts}")
-
-                yield SentenceOutput(
-                    display_text=display,
-                    tts_text=tts,
-                    actions=actions,
-                )
+                yield _to_sentence_output(sentence, display, actions, config)
+
+        return wrapper
+
+    return decorator
+
+
+def sentence_pipeline(
+    live2d_model: Live2dModel,
+    tts_preprocessor_config: TTSPreprocessorConfig = None,
+    faster_first_response: bool = True,
+    segment_method: str = "pysbd",
+    valid_tags: List[str] = None,
+):
+    """
+    Decorator that turns a token stream into `SentenceOutput`s in one generator.
+
+    Equivalent to stacking `sentence_divider`, `actions_extractor`,
+    `display_processor` and `tts_filter`, but each sentence passes through a
+    single generator instead of four.
+
+    Args:
+        live2d_model: Live2dModel - Model for expression extraction
+        tts_preprocessor_config: TTSPreprocessorConfig - Configuration for TTS preprocessing
+        faster_first_response: bool - Whether to enable faster first response
+        segment_method: str - Method for sentence segmentation
+        valid_tags: List[str] - List of valid tags to process
+    """
+
+    def decorator(
+        func: Callable[..., AsyncIterator[str]],
+    ) -> Callable[..., AsyncIterator[SentenceOutput]]:
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> AsyncIterator[SentenceOutput]:
+            divider = SentenceDivider(
+                faster_first_response=faster_first_response,
+                segment_method=segment_method,
+                valid_tags=valid_tags or ["think", "thought", "speak"],
+            )
+            config = tts_preprocessor_config or TTSPreprocessorConfig()
+            token_stream = func(*args, **kwargs)
+
+            sentence_count = 0
+            async for sentence in divider.process_stream(token_stream):
+                sentence_count += 1
+                actions = _extract_actions(sentence, live2d_model)
+                display = _to_display_text(sentence)
+                if display is not None:
+                    yield _to_sentence_output(sentence, display, actions, config)
+            logger.debug(f"sentence_pipeline: {sentence_count} sentences")
 
         return wrapper
 
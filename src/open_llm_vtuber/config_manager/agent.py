@@ -64,6 +64,7 @@ class MCPAgentConfig(I18nMixin, BaseModel):
     faster_first_response: Optional[bool] = Field(True, alias="faster_first_response")
     segment_method: Literal["regex", "pysbd"] = Field("pysbd", alias="segment_method")
     mcp_servers: Optional[Dict[str, Dict]] = Field(default_factory=dict, alias="mcp_servers")
+    max_memory_messages: int = Field(128, alias="max_memory_messages")
     
     DESCRIPTIONS: ClassVar[Dict[str, Description]] = {
         "llm_provider": Description(
@@ -82,6 +83,10 @@ class MCPAgentConfig(I18nMixin, BaseModel):
             en="MCP server configurations for tool calling",
             zh="用于工具调用的 MCP 服务器配置",
         ),
+        "max_memory_messages": Description(
+            en="Maximum number of messages kept in the agent's chat memory (default: 128)",
+            zh="智能体对话记忆中保留的最大消息数（默认：128）",
+        ),
     }
 
 
@@ -6,200 +6,267 @@ import asyncio
 import sys
 import subprocess
 import io
-from contextlib import AsyncExitStack
+from contextlib import AsyncExitStack, asynccontextmanager
 from loguru import logger
 
 
+if sys.version_info >= (3, 11):
+    _timeout = asyncio.timeout
+else:
+    @asynccontextmanager
+    async def _timeout(delay: float):
+        """Minimal `asyncio.timeout` stand-in for Python 3.10 (no extra task per call)"""
+        task = asyncio.current_task()
+        timed_out = False
+
+        def _expire():
+            nonlocal timed_out
+            timed_out = True
+            task.cancel()
+
+        handle = asyncio.get_running_loop().call_later(delay, _expire)
+        try:
+            yield
+        except asyncio.CancelledError:
+            if timed_out:
+                raise asyncio.TimeoutError from None
+            raise
+        finally:
+            handle.cancel()
+
+
+def _input_schema_of(tool) -> Optional[dict]:
+    """Return a tool's input schema, handling both snake_case and camelCase attribute names"""
+    # Only fall back to the camelCase lookup when the first one misses
+    schema = getattr(tool, 'input_schema', None)
+    if schema is None:
+        schema = getattr(tool, 'inputSchema', None)
+    return schema
+
+
 class MCPClientManager:
     def __init__(self, mcp_configs: dict):
         self.configs = mcp_configs
         self.servers = {}
         self.tools_cache = {}
-        self.exit_stack = AsyncExitStack()  # Manage async contexts
+        # LLM tool schemas derived from tools_cache; rebuilt only when the tool set changes
+        self._llm_schema_cache: Optional[List[Dict]] = None
+        # One task per server owns that server's transport and session contexts
+        self._server_tasks: List[asyncio.Task] = []
+        self._shutdown_event: Optional[asyncio.Event] = None
         
     async def initialize(self):
-        """Connect to all configured MCP servers generically"""
-        logger.debug("Initializing MCPClientManager exit stack")
-        await self.exit_stack.__aenter__()  # Initialize the exit stack
-        logger.debug("Exit stack initialized")
-        
+        """Connect to all configured MCP servers concurrently"""
         logger.debug(f"Total MCP servers to connect: {len(self.configs)}")
+        self._shutdown_event = asyncio.Event()
+        
+        ready_events = []
         for server_name, config in self.configs.items():
+            ready = asyncio.Event()
+            ready_events.append(ready)
+            self._server_tasks.append(asyncio.create_task(
+                self._run_server(server_name, config, ready),
+                name=f"mcp-server-{server_name}"
+            ))
+        
+        # Startup takes as long as the slowest server rather than the sum of all
+        await asyncio.gather(*(ready.wait() for ready in ready_events))
+        logger.info(f"Connected to {len(self.servers)}/{len(self.configs)} MCP servers")
+        
+        # The tool set is fixed from here on, so build the LLM schemas once
+        self._llm_schema_cache = self._build_tool_schemas_for_llm()
+    
+    async def _run_server(self, server_name: str, config: dict, ready: asyncio.Event):
+        """
+        Own a single server connection for its whole lifetime.
+        
+        The transport and session contexts are entered and exited in this task,
+        since anyio cancel scopes must not cross tasks. `ready` is set once the
+        connection attempt has finished, whether it succeeded or not.
+        """
+        connected = False
+        try:
+            async with AsyncExitStack() as exit_stack:
+                connected = await self._connect_one(server_name, config, exit_stack)
+                if not connected:
+                    # The session is closed with this stack, so don't keep it around
+                    self.servers.pop(server_name, None)
+                ready.set()
+                if connected:
+                    await self._shutdown_event.wait()
+        except Exception as e:
+            if connected:
+                logger.error(f"Error while closing MCP server {server_name}: {e}")
+            else:
+                logger.error(f"Failed to connect to MCP server {server_name}: {e}")
+        finally:
+            ready.set()
+    
+    async def _connect_one(self, server_name: str, config: dict, exit_stack: AsyncExitStack) -> bool:
+        """Connect to one MCP server and cache its tools. Returns True on success."""
+        logger.info(f"========== Attempting to connect to MCP server: {server_name} ==========")
+        transport_type = config.get("type", "stdio")
+        logger.debug(f"Transport type: {transport_type}")
+        
+        if transport_type == "stdio":
+            # Create server parameters
+            logger.debug(f"Creating stdio params for {server_name}:")
+            logger.debug(f"  Command: {config['command']}")
+            logger.debug(f"  Args: {config.get('args', [])}")
+            logger.debug(f"  Raw env from config: {config.get('env')}")
+            
+            # On Windows, we need to pass None for env to use default environment
+            # Empty dict {} causes issues with subprocess creation
+            env = config.get("env")
+            if env == {}:
+                logger.debug("  Converting empty env dict to None for default environment")
+                env = None
+            
+            logger.debug(f"  Final env: {env}")
+            logger.debug(f"  Platform: {sys.platform}")
+            
+            server_params = StdioServerParameters(
+                command=config["command"],
+                args=config.get("args", []),
+                env=env
+            )
+            logger.debug(f"StdioServerParameters created: {server_params}")
+            
+            # Start stdio client and keep it alive using exit stack
+            logger.debug(f"About to call stdio_client() for {server_name}")
+            logger.debug(f"Full command that will be executed: {config['command']} {' '.join(config.get('args', []))}")
+            
             try:
-                logger.info(f"========== Attempting to connect to MCP server: {server_name} ==========")
-                transport_type = config.get("type", "stdio")
-                logger.debug(f"Transport type: {transport_type}")
-                
-                if transport_type == "stdio":
-                    # Create server parameters
-                    logger.debug(f"Creating stdio params for {server_name}:")
-                    logger.debug(f"  Command: {config['command']}")
-                    logger.debug(f"  Args: {config.get('args', [])}")
-                    logger.debug(f"  Raw env from config: {config.get('env')}")
-                    
-                    # On Windows, we need to pass None for env to use default environment
-                    # Empty dict {} causes issues with subprocess creation
-                    env = config.get("env")
-                    if env == {}:
-                        logger.debug("  Converting empty env dict to None for default environment")
-                        env = None
-                    
-                    logger.debug(f"  Final env: {env}")
-                    logger.debug(f"  Platform: {sys.platform}")
-                    
-                    server_params = StdioServerParameters(
-                        command=config["command"],
-                        args=config.get("args", []),
-                        env=env
-                    )
-                    logger.debug(f"StdioServerParameters created: {server_params}")
-                    
-                    # Start stdio client and keep it alive using exit stack
-                    logger.debug(f"About to call stdio_client() for {server_name}")
-                    logger.debug(f"Full command that will be executed: {config['command']} {' '.join(config.get('args', []))}")
-                    
-                    try:
-                        logger.debug("Entering stdio_client context manager...")
-                        transport = await asyncio.wait_for(
-                            self.exit_stack.enter_async_context(stdio_client(server_params)),
-                            timeout=10.0  # Increased timeout for debugging
-                        )
-                        logger.debug(f"stdio_client context manager entered successfully")
-                        read, write = transport
-                        logger.debug(f"Got stdio streams for {server_name}: read={read}, write={write}")
-                    except asyncio.TimeoutError:
-                        logger.error(f"TIMEOUT: stdio_client took more than 10 seconds for {server_name}")
-                        logger.error(f"Command was: {config['command']} {' '.join(config.get('args', []))}")
-                        logger.error(f"This usually means:")
-                        logger.error(f"  1. The subprocess failed to start")
-                        logger.error(f"  2. The command is invalid or not found")
-                        logger.error(f"  3. The subprocess is waiting for input")
-                        continue
-                    except Exception as e:
-                        logger.error(f"Exception creating stdio transport: {type(e).__name__}: {e}")
-                        import traceback
-                        logger.error(traceback.format_exc())
-                        continue
-                    
-                    # Create and initialize session using context manager
-                    logger.debug(f"Creating ClientSession for {server_name}")
-                    session = await self.exit_stack.enter_async_context(ClientSession(read, write))
-                    logger.debug(f"ClientSession context entered, about to call initialize()")
-                    
-                    try:
-                        logger.debug(f"Calling session.initialize() for {server_name}...")
-                        await asyncio.wait_for(session.initialize(), timeout=10.0)
-                        logger.debug(f"session.initialize() completed successfully for {server_name}")
-                    except asyncio.TimeoutError:
-                        logger.error(f"TIMEOUT: session.initialize() took more than 10 seconds for {server_name}")
-                        logger.error(f"This means the MCP server is not responding to the initialization handshake")
-                        logger.error(f"Possible causes:")
-                        logger.error(f"  1. The MCP server doesn't implement the protocol correctly")
-                        logger.error(f"  2. The server crashed during startup")
-                        logger.error(f"  3. There's a version mismatch in the protocol")
-                        continue
-                    except Exception as e:
-                        logger.error(f"Exception during session initialization: {type(e).__name__}: {e}")
-                        import traceback
-                        logger.error(traceback.format_exc())
-                        continue
-                    
-                    # Store the session
-                    self.servers[server_name] = session
-                    logger.debug(f"Session stored for {server_name}")
-                    
-                    # Discover tools
-                    logger.debug(f"Calling session.list_tools() for {server_name}...")
-                    try:
-                        tools_response = await asyncio.wait_for(session.list_tools(), timeout=5.0)
-                        logger.debug(f"list_tools() returned {len(tools_response.tools) if hasattr(tools_response, 'tools') else 'unknown'} tools")
-                    except asyncio.TimeoutError:
-                        logger.error(f"TIMEOUT: list_tools() took more than 5 seconds for {server_name}")
-                        continue
-                    except Exception as e:
-                        logger.error(f"Exception listing tools: {type(e).__name__}: {e}")
-                        continue
-                    
-                    # Cache tools with namespaced names
-                    logger.debug(f"Caching tools for {server_name}")
-                    for i, tool in enumerate(tools_response.tools):
-                        namespaced_name = f"{server_name}.{tool.name}"
-                        logger.debug(f"  Tool {i+1}: {tool.name} -> {namespaced_name}")
-                        # Handle both snake_case and camelCase attribute names
-                        input_schema = getattr(tool, 'input_schema', getattr(tool, 'inputSchema', None))
-                        self.tools_cache[namespaced_name] = {
-                            "server_name": server_name,
-                            "original_name": tool.name,
-                            "description": tool.description,
-                            "input_schema": input_schema
-                        }
-                    
-                    logger.info(f"✓ Successfully connected to {server_name}, found {len(tools_response.tools)} tools")
-                    
-                elif transport_type == "sse":
-                    # For SSE, use sse_client
-                    url = config["url"]
-                    headers = config.get("headers", {})
-                    
-                    logger.debug(f"Starting SSE client for {server_name} at {url}")
-                    transport = await self.exit_stack.enter_async_context(
-                        sse_client(url, headers=headers)
-                    )
-                    read, write = transport
-                    logger.debug(f"Got SSE streams for {server_name}")
-                    
-                    # Create and initialize session using context manager
-                    session = await self.exit_stack.enter_async_context(ClientSession(read, write))
+                logger.debug("Entering stdio_client context manager...")
+                async with _timeout(10.0):  # Increased timeout for debugging
+                    transport = await exit_stack.enter_async_context(stdio_client(server_params))
+                logger.debug(f"stdio_client context manager entered successfully")
+                read, write = transport
+                logger.debug(f"Got stdio streams for {server_name}: read={read}, write={write}")
+            except asyncio.TimeoutError:
+                logger.error(f"TIMEOUT: stdio_client took more than 10 seconds for {server_name}")
+                logger.error(f"Command was: {config['command']} {' '.join(config.get('args', []))}")
+                logger.error(f"This usually means:")
+                logger.error(f"  1. The subprocess failed to start")
+                logger.error(f"  2. The command is invalid or not found")
+                logger.error(f"  3. The subprocess is waiting for input")
+                return False
+            except Exception as e:
+                logger.opt(exception=True).error(f"Exception creating stdio transport: {type(e).__name__}: {e}")
+                return False
+            
+            # Create and initialize session using context manager
+            logger.debug(f"Creating ClientSession for {server_name}")
+            session = await exit_stack.enter_async_context(ClientSession(read, write))
+            logger.debug(f"ClientSession context entered, about to call initialize()")
+            
+            try:
+                logger.debug(f"Calling session.initialize() for {server_name}...")
+                async with _timeout(10.0):
                     await session.initialize()
-                    logger.debug(f"Session initialized for {server_name}")
-                    
-                    # Store the session
-                    self.servers[server_name] = session
-                    logger.debug(f"Session stored for {server_name}")
-                    
-                    # Discover tools
-                    logger.debug(f"Calling session.list_tools() for {server_name}...")
-                    try:
-                        tools_response = await asyncio.wait_for(session.list_tools(), timeout=5.0)
-                        logger.debug(f"list_tools() returned {len(tools_response.tools) if hasattr(tools_response, 'tools') else 'unknown'} tools")
-                    except asyncio.TimeoutError:
-                        logger.error(f"TIMEOUT: list_tools() took more than 5 seconds for {server_name}")
-                        continue
-                    except Exception as e:
-                        logger.error(f"Exception listing tools: {type(e).__name__}: {e}")
-                        continue
-                    
-                    # Cache tools with namespaced names
-                    logger.debug(f"Caching tools for {server_name}")
-                    for i, tool in enumerate(tools_response.tools):
-                        namespaced_name = f"{server_name}.{tool.name}"
-                        logger.debug(f"  Tool {i+1}: {tool.name} -> {namespaced_name}")
-                        # Handle both snake_case and camelCase attribute names
-                        input_schema = getattr(tool, 'input_schema', getattr(tool, 'inputSchema', None))
-                        self.tools_cache[namespaced_name] = {
-                            "server_name": server_name,
-                            "original_name": tool.name,
-                            "description": tool.description,
-                            "input_schema": input_schema
-                        }
-                    
-                    logger.info(f"✓ Successfully connected to {server_name}, found {len(tools_response.tools)} tools")
-                    
-                else:
-                    logger.warning(f"Unknown transport type {transport_type} for {server_name}")
-                    continue
-                
+                logger.debug(f"session.initialize() completed successfully for {server_name}")
+            except asyncio.TimeoutError:
+                logger.error(f"TIMEOUT: session.initialize() took more than 10 seconds for {server_name}")
+                logger.error(f"This means the MCP server is not responding to the initialization handshake")
+                logger.error(f"Possible causes:")
+                logger.error(f"  1. The MCP server doesn't implement the protocol correctly")
+                logger.error(f"  2. The server crashed during startup")
+                logger.error(f"  3. There's a version mismatch in the protocol")
+                return False
             except Exception as e:
-                logger.error(f"Failed to connect to MCP server {server_name}: {e}")
-                # Continue with other servers
+                logger.opt(exception=True).error(f"Exception during session initialization: {type(e).__name__}: {e}")
+                return False
+            
+            # Store the session
+            self.servers[server_name] = session
+            logger.debug(f"Session stored for {server_name}")
+            
+            # Discover tools
+            logger.debug(f"Calling session.list_tools() for {server_name}...")
+            try:
+                async with _timeout(5.0):
+                    tools_response = await session.list_tools()
+                logger.debug(f"list_tools() returned {len(tools_response.tools) if hasattr(tools_response, 'tools') else 'unknown'} tools")
+            except asyncio.TimeoutError:
+                logger.error(f"TIMEOUT: list_tools() took more than 5 seconds for {server_name}")
+                return False
+            except Exception as e:
+                logger.error(f"Exception listing tools: {type(e).__name__}: {e}")
+                return False
+            
+            # Cache tools with namespaced names
+            self._ingest_tools(server_name, tools_response)
+            
+            logger.info(f"✓ Successfully connected to {server_name}, found {len(tools_response.tools)} tools")
+            
+        elif transport_type == "sse":
+            # For SSE, use sse_client
+            url = config["url"]
+            headers = config.get("headers", {})
+            
+            logger.debug(f"Starting SSE client for {server_name} at {url}")
+            transport = await exit_stack.enter_async_context(
+                sse_client(url, headers=headers)
+            )
+            read, write = transport
+            logger.debug(f"Got SSE streams for {server_name}")
+            
+            # Create and initialize session using context manager
+            session = await exit_stack.enter_async_context(ClientSession(read, write))
+            await session.initialize()
+            logger.debug(f"Session initialized for {server_name}")
+            
+            # Store the session
+            self.servers[server_name] = session
+            logger.debug(f"Session stored for {server_name}")
+            
+            # Discover tools
+            logger.debug(f"Calling session.list_tools() for {server_name}...")
+            try:
+                async with _timeout(5.0):
+                    tools_response = await session.list_tools()
+                logger.debug(f"list_tools() returned {len(tools_response.tools) if hasattr(tools_response, 'tools') else 'unknown'} tools")
+            except asyncio.TimeoutError:
+                logger.error(f"TIMEOUT: list_tools() took more than 5 seconds for {server_name}")
+                return False
+            except Exception as e:
+                logger.error(f"Exception listing tools: {type(e).__name__}: {e}")
+                return False
+            
+            # Cache tools with namespaced names
+            self._ingest_tools(server_name, tools_response)
+            
+            logger.info(f"✓ Successfully connected to {server_name}, found {len(tools_response.tools)} tools")
+            
+        else:
+            logger.warning(f"Unknown transport type {transport_type} for {server_name}")
+            return False
+        
+        return True
+    
+    def _ingest_tools(self, server_name: str, tools_response) -> None:
+        """Cache a server's tools under `<server_name>.<tool_name>` names"""
+        # Intern the prefix once so every cache entry shares the same string
+        server_name = sys.intern(server_name)
+        self.tools_cache.update({
+            f"{server_name}.{tool.name}": {
+                "server_name": server_name,
+                "original_name": tool.name,
+                "description": tool.description,
+                "input_schema": _input_schema_of(tool)
+            }
+            for tool in tools_response.tools
+        })
+        logger.debug(f"Cached tools for {server_name}: {[tool.name for tool in tools_response.tools]}")
     
     async def shutdown(self):
         """Gracefully close all MCP sessions"""
-        try:
-            await self.exit_stack.__aexit__(None, None, None)
-            logger.info("All MCP connections closed")
-        except Exception as e:
-            logger.error(f"Error during MCP shutdown: {e}")
+        if self._shutdown_event is None:
+            return
+        self._shutdown_event.set()
+        await asyncio.gather(*self._server_tasks, return_exceptions=True)
+        self._server_tasks.clear()
+        logger.info("All MCP connections closed")
     
     def _simplify_schema_for_gemini(self, schema: dict) -> dict:
         """Simplify complex JSON schemas for Gemini compatibility"""
@@ -237,6 +304,12 @@ class MCPClientManager:
         return simplified
     
     def get_tool_schemas_for_llm(self) -> List[Dict]:
+        """Return MCP tools in OpenAI function calling format (cached)"""
+        if self._llm_schema_cache is None:
+            self._llm_schema_cache = self._build_tool_schemas_for_llm()
+        return self._llm_schema_cache
+    
+    def _build_tool_schemas_for_llm(self) -> List[Dict]:
         """Convert MCP tools to OpenAI function calling format"""
         tools = []
         for tool_name, tool_info in self.tools_cache.items():
@@ -283,14 +356,12 @@ class MCPClientManager:
         logger.debug(f"Converting CallToolResult to dict for {namespaced_name}")
         
         # Extract the text content from the result
-        extracted_content = []
-        if hasattr(result, 'content') and result.content:
-            for content_item in result.content:
-                if hasattr(content_item, 'text'):
-                    extracted_content.append(content_item.text)
-                elif hasattr(content_item, 'type') and content_item.type == 'text':
-                    # Fallback if text is stored differently
-                    extracted_content.append(str(content_item))
+        # Only TextContent items (type == 'text') carry a `text` attribute
+        extracted_content = [
+            content_item.text
+            for content_item in getattr(result, 'content', None) or ()
+            if getattr(content_item, 'type', None) == 'text'
+        ]
         
         # Build the response in a JSON-serializable format
         response = {
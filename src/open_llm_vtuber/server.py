@@ -1,34 +1,527 @@
+import asyncio
+import ctypes
+import glob
+import mimetypes
 import os
 import shutil
+import stat
+import sys
+import time
+from collections import OrderedDict
 from contextlib import asynccontextmanager
+from email.utils import formatdate
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
-from fastapi import FastAPI
-from starlette.middleware.cors import CORSMiddleware
+import uvicorn
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from starlette.responses import Response
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import ASGIApp
 from loguru import logger
 
 from .routes import init_client_ws_route, init_webtool_routes
 from .service_context import ServiceContext
 from .config_manager.utils import Config
 
+# Use uvloop for the event loop where it is available (it is not on Windows)
+if sys.platform != "win32":
+    try:
+        import uvloop
 
-class CustomStaticFiles(StaticFiles):
-    async def get_response(self, path, scope):
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        uvloop = None
+else:
+    uvloop = None
+
+# Event loop implementation for uvicorn to run this server on
+UVICORN_LOOP = "uvloop" if uvloop is not None else "auto"
+
+# Register the content types the frontend relies on once, instead of depending
+# on (or patching after the fact) the platform's MIME database
+mimetypes.init()
+for _media_type, _extension in (
+    ("application/javascript", ".js"),
+    ("text/javascript", ".mjs"),
+    ("application/wasm", ".wasm"),
+    ("application/json", ".json"),
+):
+    mimetypes.add_type(_media_type, _extension)
+
+# renameat2() arguments for atomically exchanging two paths (Linux)
+_AT_FDCWD = -100
+_RENAME_EXCHANGE = 2
+
+# File types served from the avatars directory
+_AVATAR_EXTENSIONS = frozenset(("jpg", "jpeg", "png", "gif", "svg"))
+
+# Encoded Content-Type values for common static file extensions
+_CONTENT_TYPES = {
+    "html": b"text/html; charset=utf-8",
+    "js": b"application/javascript",
+    "mjs": b"text/javascript",
+    "css": b"text/css; charset=utf-8",
+    "json": b"application/json",
+    "wasm": b"application/wasm",
+    "png": b"image/png",
+    "jpg": b"image/jpeg",
+    "jpeg": b"image/jpeg",
+    "gif": b"image/gif",
+    "svg": b"image/svg+xml",
+}
+
+# Cache-Control for files whose content never changes under the same name
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# In-memory static cache limits (per mount)
+STATIC_CACHE_MAX_FILE_SIZE = 1 << 20  # 1 MiB
+STATIC_CACHE_MAX_SIZE = 64 << 20  # 64 MiB
+
+
+@lru_cache(maxsize=4096)
+def _static_etag(mtime_ns: int, size: int) -> str:
+    """ETag derived from a file's mtime and size"""
+    return f'"{mtime_ns:x}-{size:x}"'
+
+
+def _exchange_paths(path_a: str, path_b: str) -> bool:
+    """Atomically swap two paths with renameat2(RENAME_EXCHANGE), if available"""
+    if sys.platform != "linux":
+        return False
+    try:
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError):
+        return False
+    return (
+        renameat2(
+            _AT_FDCWD,
+            os.fsencode(path_a),
+            _AT_FDCWD,
+            os.fsencode(path_b),
+            _RENAME_EXCHANGE,
+        )
+        == 0
+    )
+
+
+def _content_type_header(full_path: str, media_type: str) -> bytes:
+    """Encoded Content-Type value for a file, from the extension table when possible"""
+    content_type = _CONTENT_TYPES.get(full_path.rpartition(".")[2].lower())
+    if content_type is not None:
+        return content_type
+    if media_type.startswith("text/"):
+        media_type += "; charset=utf-8"
+    return media_type.encode("latin-1")
+
+
+def _request_header(scope, name: bytes) -> Optional[bytes]:
+    """Return a raw request header value, or None if the header is absent"""
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+def _etag_matches(if_none_match: bytes, etag: bytes) -> bool:
+    """Weak If-None-Match comparison, as used for conditional GETs"""
+    if if_none_match == etag or if_none_match.strip() == b"*":
+        return True
+    return any(
+        tag.strip().removeprefix(b"W/") == etag for tag in if_none_match.split(b",")
+    )
+
+
+class _CachedFile:
+    """A small static file kept in memory with its precomputed headers"""
+
+    __slots__ = (
+        "body",
+        "etag",
+        "headers",
+        "raw_headers",
+        "not_modified_headers",
+        "mtime_ns",
+    )
+
+    def __init__(
+        self,
+        body: bytes,
+        headers: dict,
+        raw_headers: List[Tuple[bytes, bytes]],
+        mtime_ns: int,
+    ):
+        self.body = body
+        self.etag = headers["etag"].encode("latin-1")
+        # `headers` serves the conditional request checks, `raw_headers` the response
+        self.headers = headers
+        self.raw_headers = raw_headers
+        self.not_modified_headers = [
+            (name, value)
+            for name, value in raw_headers
+            if name in (b"etag", b"cache-control")
+        ]
+        self.mtime_ns = mtime_ns
+
+
+class _RawResponse(Response):
+    """Response sent with pre-encoded headers as they are"""
+
+    def __init__(
+        self, body: bytes, status_code: int, raw_headers: List[Tuple[bytes, bytes]]
+    ):
+        self.status_code = status_code
+        self.body = body
+        self.background = None
+        # Copied since middlewares may append to the list they are sent
+        self.raw_headers = list(raw_headers)
+
+
+class ChunkedStaticFiles(StaticFiles):
+    """StaticFiles with a per-mount read size and the registered content types"""
+
+    # Read size per threadpool hop while streaming a file
+    chunk_size = FileResponse.chunk_size
+
+    def media_type_for(self, full_path: str) -> str:
+        """Content type to serve a file with"""
+        return mimetypes.guess_type(full_path)[0] or "text/plain"
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            method=scope["method"],
+            media_type=self.media_type_for(full_path),
+            # Same ETag as the in-memory cache, so If-Range matches either way
+            headers={
+                "etag": _static_etag(stat_result.st_mtime_ns, stat_result.st_size)
+            },
+        )
+        response.chunk_size = self.chunk_size
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+class CachedStaticFiles(ChunkedStaticFiles):
+    """
+    ChunkedStaticFiles that keeps small files in memory.
+    Entries are loaded on first hit, invalidated by mtime and evicted
+    least-recently-used first once the mount's cache budget is exceeded.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cache: OrderedDict[str, _CachedFile] = OrderedDict()
+        self._cache_size = 0
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        # Range requests are served from disk, where FileResponse answers with 206
+        if _request_header(scope, b"range") is not None:
+            return super().file_response(full_path, stat_result, scope, status_code)
+        entry = self._cache.get(full_path)
+        if entry is not None:
+            if entry.mtime_ns == stat_result.st_mtime_ns:
+                self._cache.move_to_end(full_path)
+                return self._cached_response(entry, scope, status_code)
+            self._evict(full_path)
+        return super().file_response(full_path, stat_result, scope, status_code)
+
+    async def get_response(self, path: str, scope):
         response = await super().get_response(path, scope)
-        if path.endswith(".js"):
-            response.headers["Content-Type"] = "application/javascript"
+        if (
+            isinstance(response, FileResponse)
+            and response.stat_result.st_size <= STATIC_CACHE_MAX_FILE_SIZE
+            and _request_header(scope, b"range") is None
+        ):
+            body, stat_result = await run_in_threadpool(_read_file, response.path)
+            if len(body) <= STATIC_CACHE_MAX_FILE_SIZE:
+                entry = self._store(response.path, body, stat_result)
+                return self._cached_response(entry, scope, response.status_code)
         return response
 
+    def cache_control_for(self, full_path: str) -> str:
+        """Cache-Control value for a cached file"""
+        if full_path.endswith(".html"):
+            # Revalidate pages every time; unchanged ones only cost a 304
+            return "no-cache"
+        return "public, max-age=3600"
+
+    def _cached_response(self, entry: _CachedFile, scope, status_code: int):
+        # If-None-Match takes precedence over If-Modified-Since
+        if_none_match = _request_header(scope, b"if-none-match")
+        if if_none_match is not None:
+            if status_code == 200 and _etag_matches(if_none_match, entry.etag):
+                return _RawResponse(b"", 304, entry.not_modified_headers)
+        elif self.is_not_modified(entry.headers, Headers(scope=scope)):
+            return NotModifiedResponse(entry.headers)
+        return _RawResponse(entry.body, status_code, entry.raw_headers)
+
+    def _store(self, full_path: str, body: bytes, stat_result) -> _CachedFile:
+        headers = {
+            "etag": _static_etag(stat_result.st_mtime_ns, len(body)),
+            "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+            "cache-control": self.cache_control_for(full_path),
+        }
+        raw_headers = [
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (
+                b"content-type",
+                _content_type_header(full_path, self.media_type_for(full_path)),
+            ),
+            (b"accept-ranges", b"bytes"),
+        ]
+        raw_headers.extend(
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in headers.items()
+        )
+        entry = _CachedFile(body, headers, raw_headers, stat_result.st_mtime_ns)
+        self._evict(full_path)
+        self._cache[full_path] = entry
+        self._cache_size += len(body)
+        while self._cache_size > STATIC_CACHE_MAX_SIZE:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_size -= len(evicted.body)
+        return entry
+
+    def _evict(self, full_path: str) -> None:
+        entry = self._cache.pop(full_path, None)
+        if entry is not None:
+            self._cache_size -= len(entry.body)
+
+
+def _read_file(full_path: str):
+    """Read a file together with the stat result matching its content"""
+    with open(full_path, "rb") as file:
+        stat_result = os.fstat(file.fileno())
+        return file.read(), stat_result
+
+
+class IndexedStaticFiles(CachedStaticFiles):
+    """
+    CachedStaticFiles for a directory whose files only change on deploy.
+
+    Regular files are indexed once by `build_index`, so known paths skip the
+    `realpath` containment walk: a single fresh `stat` confirms the path still
+    names the indexed file. Other paths (directories, symlinks, misses), and
+    indexed paths that were deleted or replaced, take the regular lookup.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Relative request path -> (full path, stat result)
+        self._index: Dict[str, Tuple[str, os.stat_result]] = {}
+        # Bundler output with content-hashed file names
+        self._hashed_assets_dir = os.path.join(
+            os.path.realpath(self.directory), "assets", ""
+        )
+
+    def cache_control_for(self, full_path: str) -> str:
+        # A hashed asset's content never changes under the same name
+        if full_path.startswith(self._hashed_assets_dir):
+            return IMMUTABLE_CACHE_CONTROL
+        return super().cache_control_for(full_path)
 
-class AvatarStaticFiles(StaticFiles):
+    def build_index(self) -> int:
+        """(Re)build the file index, returning the number of files indexed"""
+        index = {}
+        root = os.path.realpath(self.directory)
+        pending = [root]
+        while pending:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        index[os.path.relpath(entry.path, root)] = (
+                            entry.path,
+                            entry.stat(follow_symlinks=False),
+                        )
+        self._index = index
+        return len(index)
+
+    def lookup_path(self, path: str):
+        indexed = self._index.get(path)
+        if indexed is not None:
+            full_path, indexed_stat = indexed
+            try:
+                stat_result = os.stat(full_path, follow_symlinks=False)
+            except OSError:
+                stat_result = None
+            # Same file as at indexing time: serve it with its current stat
+            if (
+                stat_result is not None
+                and stat_result.st_ino == indexed_stat.st_ino
+                and stat_result.st_dev == indexed_stat.st_dev
+                and stat.S_ISREG(stat_result.st_mode)
+            ):
+                return full_path, stat_result
+        return super().lookup_path(path)
+
+
+class AudioCacheStaticFiles(ChunkedStaticFiles):
+    """
+    Static files for the TTS audio cache.
+    Audio files are read in large chunks, so each file takes a few threadpool
+    round trips instead of one per 64 KiB.
+    """
+
+    chunk_size = 1 << 20  # 1 MiB
+
+
+class AvatarStaticFiles(ChunkedStaticFiles):
     async def get_response(self, path: str, scope):
-        allowed_extensions = (".jpg", ".jpeg", ".png", ".gif", ".svg")
-        if not any(path.lower().endswith(ext) for ext in allowed_extensions):
+        # Only lowercase the extension, not the whole path
+        dot = path.rfind(".")
+        if dot < 0 or path[dot + 1 :].lower() not in _AVATAR_EXTENSIONS:
             return Response("Forbidden file type", status_code=403)
         return await super().get_response(path, scope)
 
 
+class AllowAllCORSMiddleware:
+    """
+    CORS middleware that allows every origin, method and header, with credentials.
+
+    Apart from the echoed origin the CORS headers are constant, so they are
+    preassembled instead of being recomputed per request. The origin is echoed
+    rather than answered with `*`, which browsers reject for credentialed requests.
+    """
+
+    _PREFLIGHT_HEADERS = (
+        (
+            b"access-control-allow-methods",
+            b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT",
+        ),
+        (b"access-control-allow-credentials", b"true"),
+        (b"access-control-max-age", b"600"),
+        (b"vary", b"Origin"),
+    )
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        requested_method = None
+        requested_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                requested_method = value
+            elif name == b"access-control-request-headers":
+                requested_headers = value
+
+        # Not a cross-origin request
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS" and requested_method is not None:
+            headers = [
+                (b"access-control-allow-origin", origin),
+                *self._PREFLIGHT_HEADERS,
+            ]
+            if requested_headers is not None:
+                headers.append((b"access-control-allow-headers", requested_headers))
+            await send(
+                {"type": "http.response.start", "status": 204, "headers": headers}
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        cors_headers = (
+            (b"access-control-allow-origin", origin),
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin"),
+        )
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *cors_headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+
+class PrefixRouter:
+    """
+    ASGI app dispatching on the first path segment with a dict lookup, instead
+    of trying a list of mounts in order. Unknown prefixes go to `fallback`.
+    """
+
+    def __init__(self, routes: Dict[str, ASGIApp], fallback: ASGIApp):
+        self.routes = routes
+        self.fallback = fallback
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            root_path = scope.get("root_path", "")
+            path = scope["path"]
+            if root_path and path.startswith(root_path):
+                path = path[len(root_path) :]
+            segment = path[1:].partition("/")[0]
+            app = self.routes.get(segment)
+            if app is not None:
+                # Same scope a `Mount` at "/<segment>" would pass down
+                scope = {**scope, "root_path": f"{root_path}/{segment}"}
+                await app(scope, receive, send)
+                return
+        await self.fallback(scope, receive, send)
+
+
+# (URL prefix, directory, StaticFiles class, html mode); the empty prefix is
+# the main frontend, served for every path no other prefix matches
+_STATIC_MOUNTS = (
+    # TTS audio is sent inline (base64) over the WebSocket and its cache file is
+    # deleted right after, so this mount only serves the odd direct fetch
+    ("cache", "cache", AudioCacheStaticFiles, False),
+    ("live2d-models", "live2d-models", CachedStaticFiles, False),
+    ("bg", "backgrounds", CachedStaticFiles, False),
+    ("avatars", "avatars", AvatarStaticFiles, False),
+    ("web-tool", "web_tool", CachedStaticFiles, True),
+    ("", "frontend", IndexedStaticFiles, True),
+)
+
+
+# Whether the static directories have been created in this process
+_dirs_ready = False
+
+
+def _remove_stale_cache_dirs() -> int:
+    """
+    Delete old cache trees left behind when a `clean_cache` was interrupted
+    (crash or kill between the swap and the delete), returning how many.
+    """
+    stale_dirs = glob.glob("cache.gc.*")
+    for path in stale_dirs:
+        shutil.rmtree(path, ignore_errors=True)
+    return len(stale_dirs)
+
+
+def _ensure_dirs() -> None:
+    """Create every static directory once per process"""
+    global _dirs_ready
+    if _dirs_ready:
+        return
+    for _, directory, _, _ in _STATIC_MOUNTS:
+        os.makedirs(directory, exist_ok=True)
+    _dirs_ready = True
+
+
+# Client addresses allowed to use the local-only admin endpoints
+_LOOPBACK_HOSTS = frozenset(("127.0.0.1", "::1"))
+
+
 class WebSocketServer:
     def __init__(self, config: Config):
         # Initialize service context first
@@ -44,6 +537,11 @@ class WebSocketServer:
             
             # Initialize async components (like MCP)
             await self.default_context_cache.initialize_async_components()
+            stale_count = await run_in_threadpool(_remove_stale_cache_dirs)
+            if stale_count:
+                logger.info("Removed {} stale cache directories", stale_count)
+            file_count = await run_in_threadpool(self._frontend.build_index)
+            logger.debug("Indexed {} frontend files", file_count)
             logger.info("Server startup complete")
             
             yield
@@ -55,70 +553,97 @@ class WebSocketServer:
         # Create FastAPI app with lifespan
         self.app = FastAPI(lifespan=lifespan)
 
-        # Add CORS
-        self.app.add_middleware(
-            CORSMiddleware,
-            allow_origins=["*"],
-            allow_credentials=True,
-            allow_methods=["*"],
-            allow_headers=["*"],
-        )
+        # Add CORS (any origin, method and header, with credentials)
+        self.app.add_middleware(AllowAllCORSMiddleware)
 
-        # Include routes with the context
+        # Include routes with the context (before the "/" static mount,
+        # whose catch-all would otherwise shadow them)
         self.app.include_router(
             init_client_ws_route(default_context_cache=self.default_context_cache),
         )
         self.app.include_router(
             init_webtool_routes(default_context_cache=self.default_context_cache),
         )
-
-        # Mount cache directory first (to ensure audio file access)
-        if not os.path.exists("cache"):
-            os.makedirs("cache")
-        self.app.mount(
-            "/cache",
-            StaticFiles(directory="cache"),
-            name="cache",
+        self.app.add_api_route(
+            "/_reload", self._reload_frontend_index, methods=["POST"]
         )
 
-        # Mount static files
-        self.app.mount(
-            "/live2d-models",
-            StaticFiles(directory="live2d-models"),
-            name="live2d-models",
-        )
+        # Create every static directory up front (so Starlette's own directory
+        # check can be skipped), then serve them all from one prefix router
+        _ensure_dirs()
+        static_apps = {}
+        for prefix, directory, static_files, html in _STATIC_MOUNTS:
+            static_apps[prefix] = static_files(
+                directory=directory, html=html, check_dir=False
+            )
+        self._frontend = static_apps.pop("")
         self.app.mount(
-            "/bg",
-            StaticFiles(directory="backgrounds"),
-            name="backgrounds",
-        )
-        self.app.mount(
-            "/avatars",
-            AvatarStaticFiles(directory="avatars"),
-            name="avatars",
+            "/", PrefixRouter(static_apps, fallback=self._frontend), name="static"
         )
 
-        # Mount web tool directory separately from frontend
-        self.app.mount(
-            "/web-tool",
-            CustomStaticFiles(directory="web_tool", html=True),
-            name="web_tool",
-        )
+    async def _reload_frontend_index(self, request: Request):
+        """
+        Rebuild the frontend file index, e.g. after rebuilding the frontend.
+        Only local clients may call it, and not from another site's page
+        (browsers send the page's Origin with cross-site POSTs).
+        """
+        client_host = request.client.host if request.client else None
+        origin = request.headers.get("origin")
+        if client_host not in _LOOPBACK_HOSTS or (
+            origin is not None
+            and origin.partition("://")[2] != request.headers.get("host")
+        ):
+            return Response("Forbidden", status_code=403)
 
-        # Mount main frontend last (as catch-all)
-        self.app.mount(
-            "/",
-            CustomStaticFiles(directory="frontend", html=True),
-            name="frontend",
-        )
+        file_count = await run_in_threadpool(self._frontend.build_index)
+        logger.info("Frontend index rebuilt: {} files", file_count)
+        return {"files": file_count}
 
-    def run(self):
-        pass
+    def run(self, host: str, port: int, log_level: str = "info"):
+        """
+        Serve the app with uvicorn, tuned for many small keep-alive requests
+        (frontend chunks, Live2D manifests and textures) next to the WebSocket.
 
-    @staticmethod
-    def clean_cache():
-        """Clean the cache directory by removing and recreating it."""
+        Equivalent command line:
+            uvicorn <module>:app --host <host> --port <port> --loop uvloop \\
+                --backlog 4096 --timeout-keep-alive 75 \\
+                --h11-max-incomplete-event-size 65536
+
+        TCP_NODELAY needs no setting here: asyncio and uvloop already enable it
+        on every accepted TCP connection.
+
+        The server runs as a single worker on purpose: WebSocket sessions, chat
+        groups, agent memory, MCP server subprocesses and the loaded ASR/TTS
+        models all live in this process, so extra workers could neither share
+        them nor afford to load their own copies.
+        """
+        uvicorn.run(
+            app=self.app,
+            host=host,
+            port=port,
+            log_level=log_level,
+            loop=UVICORN_LOOP,
+            backlog=4096,
+            timeout_keep_alive=75,
+            h11_max_incomplete_event_size=65536,
+        )
+
+    def clean_cache(self):
+        """
+        Clean the cache directory by swapping in an empty one, then deleting
+        the old files. Trees left over by an interrupted run are removed at
+        the next startup.
+        """
         cache_dir = "cache"
-        if os.path.exists(cache_dir):
-            shutil.rmtree(cache_dir)
+        if not os.path.exists(cache_dir):
+            return
+
+        old_dir = f"{cache_dir}.gc.{os.getpid()}.{time.time_ns()}"
+        os.makedirs(old_dir)
+        if not _exchange_paths(cache_dir, old_dir):
+            # No atomic exchange: briefly leave no cache directory in place
+            os.rmdir(old_dir)
+            os.rename(cache_dir, old_dir)
             os.makedirs(cache_dir)
+
+        shutil.rmtree(old_dir, ignore_errors=True)
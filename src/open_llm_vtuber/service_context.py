@@ -55,6 +55,10 @@ class ServiceContext:
 
         self.history_uid: str = ""  # Add history_uid field
 
+        # Whether the configs are references to another context's configs,
+        # to be copied before they are first changed in place
+        self._configs_shared: bool = False
+
     def __str__(self):
         return (
             f"ServiceContext:\n"
@@ -89,6 +93,7 @@ class ServiceContext:
         """
         Load the ServiceContext with the reference of the provided instances.
         Pass by reference so no reinitialization will be done.
+        The configs are shared too, and only copied on the first config change.
         """
         if not character_config:
             raise ValueError("character_config cannot be None")
@@ -104,6 +109,7 @@ class ServiceContext:
         self.vad_engine = vad_engine
         self.agent_engine = agent_engine
         self.translate_engine = translate_engine
+        self._configs_shared = True
 
         logger.debug(f"Loaded service context with cache: {character_config}")
 
@@ -115,6 +121,9 @@ class ServiceContext:
         Parameters:
         - config (Dict): The configuration dictionary.
         """
+        # The init_* methods below update the current configs in place
+        self._own_configs()
+
         if not self.config:
             self.config = config
 
@@ -153,6 +162,16 @@ class ServiceContext:
         self.system_config = config.system_config or self.system_config
         self.character_config = config.character_config
 
+    def _own_configs(self) -> None:
+        """Replace shared configs with private copies before changing them"""
+        if not self._configs_shared:
+            return
+        if self.config is not None:
+            self.config = self.config.model_copy(deep=True)
+        self.system_config = self.system_config.model_copy(deep=True)
+        self.character_config = self.character_config.model_copy(deep=True)
+        self._configs_shared = False
+
     def init_live2d(self, live2d_model_name: str) -> None:
         logger.info(f"Initializing Live2D: {live2d_model_name}")
         try:
@@ -253,25 +272,27 @@ class ServiceContext:
                 logger.info("Initializing MCP connections...")
                 try:
                     await self.agent_engine.start()
+                    logger.opt(lazy=True).debug(
+                        "MCP tools available: {}",
+                        lambda: list(self.agent_engine.mcp_manager.tools_cache)
+                        if self.agent_engine.mcp_manager
+                        else [],
+                    )
                 except Exception as e:
-                    logger.error(f"Failed to initialize MCP connections: {e}")
+                    logger.error("Failed to initialize MCP connections: {}", e)
                     # Don't fail server startup if MCP fails to initialize
                     logger.warning("Continuing without MCP connections")
     
     async def shutdown_async_components(self) -> None:
         """Shutdown any async components gracefully"""
-        # Shutdown MCP connections if using MCPAgent
-        if (self.agent_engine and 
-            self.character_config and 
-            self.character_config.agent_config and
-            self.character_config.agent_config.conversation_agent_choice == "mcp_agent"):
-            from .agent.agents.mcp_agent import MCPAgent
-            if isinstance(self.agent_engine, MCPAgent):
-                logger.info("Shutting down MCP connections...")
-                try:
-                    await self.agent_engine.shutdown()
-                except Exception as e:
-                    logger.error(f"Failed to shutdown MCP connections cleanly: {e}")
+        # Shutdown MCP connections (if using MCPAgent) and pooled LLM connections
+        shutdown = getattr(self.agent_engine, "shutdown", None)
+        if shutdown is not None:
+            logger.info("Shutting down agent connections...")
+            try:
+                await shutdown()
+            except Exception as e:
+                logger.error(f"Failed to shutdown agent connections cleanly: {e}")
     
     def init_translate(self, translator_config: TranslatorConfig) -> None:
         """Initialize or update the translation engine based on the configuration."""
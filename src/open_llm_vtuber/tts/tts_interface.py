@@ -71,8 +71,7 @@ class TTSInterface(metaclass=abc.ABCMeta):
         str: the path to the generated cache file
         """
         cache_dir = "cache"
-        if not os.path.exists(cache_dir):
-            os.makedirs(cache_dir)
+        os.makedirs(cache_dir, exist_ok=True)
 
         if file_name_no_ext is None:
             file_name_no_ext = "temp"
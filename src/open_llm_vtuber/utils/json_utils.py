@@ -0,0 +1,46 @@
+"""
+JSON helpers for the LLM and MCP hot paths.
+
+Uses `orjson` when it is installed and falls back to the standard library
+`json` module otherwise, so `orjson` stays an optional speedup
+(installed with the `fast-json` extra).
+"""
+
+import json
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps_bytes(
+    obj: Any, sort_keys: bool = False, default: Optional[Callable] = None
+) -> bytes:
+    """
+    Serialize `obj` to UTF-8 encoded JSON bytes.
+
+    Args:
+        obj: The object to serialize
+        sort_keys: Whether to sort dictionary keys (for stable hashing)
+        default: Fallback serializer for unsupported types
+
+    Returns:
+        bytes: The compact JSON encoding of `obj`
+    """
+    if orjson is not None:
+        option = orjson.OPT_SORT_KEYS if sort_keys else 0
+        return orjson.dumps(obj, default=default, option=option)
+    return json.dumps(
+        obj,
+        sort_keys=sort_keys,
+        default=default,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode()
+
+
+def dumps(obj: Any) -> str:
+    """Serialize `obj` to a compact JSON string."""
+    return dumps_bytes(obj).decode()
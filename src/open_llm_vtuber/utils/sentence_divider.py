@@ -4,7 +4,7 @@ import pysbd
 from loguru import logger
 from langdetect import detect
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 # Constants for additional checks
 COMMAS = [
@@ -276,7 +276,7 @@ class TagState(Enum):
     NONE = "none"  # no tag
 
 
-@dataclass
+@dataclass(slots=True)
 class TagInfo:
     """Information about a tag"""
 
@@ -290,12 +290,41 @@ class TagInfo:
         return f"{self.name}:{self.state.value}"
 
 
-@dataclass
+# Per-sentence tag flags (`SentenceWithTags.flags`)
+HAS_THOUGHT = 1  # a thought tag is open, starting or ending: never displayed
+HAS_THINK = 2  # any think/thought tag: skipped by TTS
+IS_TAG_BOUNDARY = 4  # some tag starts or ends in this sentence
+
+_BOUNDARY_STATES = frozenset((TagState.START, TagState.END))
+_THOUGHT_STATES = frozenset((TagState.INSIDE, TagState.START, TagState.END))
+
+
+def _compute_tag_flags(tags: List[TagInfo]) -> int:
+    """Classify a sentence's tags in a single pass"""
+    flags = 0
+    for tag in tags:
+        if tag.state in _BOUNDARY_STATES:
+            flags |= IS_TAG_BOUNDARY
+        if tag.name == "thought":
+            flags |= HAS_THINK
+            if tag.state in _THOUGHT_STATES:
+                flags |= HAS_THOUGHT
+        elif tag.name == "think":
+            flags |= HAS_THINK
+    return flags
+
+
+@dataclass(slots=True)
 class SentenceWithTags:
     """A sentence with its tag information, supporting nested tags"""
 
     text: str
     tags: List[TagInfo]  # List of tags from outermost to innermost
+    # Bitmask of tag properties, classified once from `tags` on construction
+    flags: int = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        self.flags = _compute_tag_flags(self.tags)
 
 
 class SentenceDivider:
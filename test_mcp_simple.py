@@ -5,7 +5,43 @@ Simple test to check if MCP servers are running and responsive
 import subprocess
 import asyncio
 import sys
-import json
+
+from src.open_llm_vtuber.utils.json_utils import dumps_bytes
+
+# Largest line (or stderr chunk) read from the server in one go
+STREAM_LIMIT = 65536
+
+# Newline-delimited JSON-RPC request with the constant parts pre-serialized
+REQUEST_FRAME = b'{"jsonrpc":"2.0","id":%d,"method":%b,"params":%b}\n'
+
+
+def frame_request(request_id: int, method: str, params: dict) -> bytes:
+    """Encode one JSON-RPC request as a line for the server's stdin"""
+    return REQUEST_FRAME % (request_id, dumps_bytes(method), dumps_bytes(params))
+
+
+async def read_response(stdout, timeout):
+    """Read one newline-terminated message from the server, or None if there is none"""
+    try:
+        return await asyncio.wait_for(stdout.readuntil(b"\n"), timeout=timeout)
+    except asyncio.TimeoutError:
+        print(f"No response received within {timeout:g} seconds")
+    except asyncio.LimitOverrunError:
+        print(f"Response line is longer than {STREAM_LIMIT} bytes")
+    except asyncio.IncompleteReadError as e:
+        print("Server closed stdout before a complete response")
+        return e.partial or None
+    return None
+
+
+async def collect_stderr(stderr_task, timeout):
+    """Wait briefly for a pending stderr read, cancelling it if the server wrote nothing"""
+    done, _ = await asyncio.wait({stderr_task}, timeout=timeout)
+    if not done:
+        stderr_task.cancel()
+        return None
+    return stderr_task.result()
+
 
 async def test_mcp_server():
     """Test MCP server by running it and sending a simple message"""
@@ -21,7 +57,8 @@ async def test_mcp_server():
             *cmd,
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
+            stderr=subprocess.PIPE,
+            limit=STREAM_LIMIT
         )
         
         print("Process started, PID:", proc.pid)
@@ -30,36 +67,32 @@ async def test_mcp_server():
         await asyncio.sleep(1)
         
         # Send a simple JSON-RPC message to see if it responds
-        test_message = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "initialize",
-            "params": {
+        message = frame_request(
+            1,
+            "initialize",
+            {
                 "protocolVersion": "2024-11-05",  # Try an older version
                 "capabilities": {}
-            }
-        }
-        
-        message_str = json.dumps(test_message) + "\n"
-        print(f"Sending: {message_str.strip()}")
+            },
+        )
+        print(f"Sending: {message.decode().strip()}")
         
-        proc.stdin.write(message_str.encode())
-        await proc.stdin.drain()
+        proc.stdin.write(message)
         
-        # Try to read response with timeout
-        try:
-            response = await asyncio.wait_for(proc.stdout.readline(), timeout=5.0)
+        # Read stderr in the background while the request is flushed and answered
+        stderr_task = asyncio.create_task(proc.stderr.read(STREAM_LIMIT))
+        _, response = await asyncio.gather(
+            proc.stdin.drain(),
+            read_response(proc.stdout, 5.0),
+        )
+        # Once the response is in, only give stderr a short grace period
+        stderr_data = await collect_stderr(stderr_task, 0.5)
+        if response:
             print(f"Response: {response.decode().strip()}")
-        except asyncio.TimeoutError:
-            print("No response received within 5 seconds")
             
         # Check stderr
-        try:
-            stderr_data = await asyncio.wait_for(proc.stderr.read(1024), timeout=0.5)
-            if stderr_data:
-                print(f"Stderr: {stderr_data.decode()}")
-        except asyncio.TimeoutError:
-            pass
+        if stderr_data:
+            print(f"Stderr: {stderr_data.decode()}")
             
         # Terminate the process
         proc.terminate()
@@ -0,0 +1,10 @@
+from src.open_llm_vtuber.agent.output_types import Actions, DisplayText, SentenceOutput
+
+
+def test_sentence_output_has_no_instance_dict():
+    output = SentenceOutput(
+        display_text=DisplayText(text="Hello"),
+        tts_text="Hello",
+        actions=Actions(),
+    )
+    assert not hasattr(output, "__dict__")